@@ -0,0 +1,17 @@
+from typing import Callable
+
+from agents import Agent
+
+
+class AgentPool:
+    """Keeps one configured Agent per key so agents built on demand are created once and then reused."""
+
+    def __init__(self):
+        self._agents: dict[str, Agent] = {}
+
+    def get(self, key: str, factory: Callable[[], Agent]) -> Agent:
+        """Return the agent stored under key, building it with factory on first use."""
+        agent = self._agents.get(key)
+        if agent is None:
+            agent = self._agents[key] = factory()
+        return agent
@@ -1,24 +1,43 @@
 import os
+import asyncio
 import gradio as gr
 import logging
+import queue
 import tempfile
+import atexit
+import contextlib
+import time
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 from dotenv import load_dotenv
-from research_manager import ResearchManager
+from markdown_it import MarkdownIt
+from research_manager import ResearchManager, ReportChunk
 
 # Configure logging
+# Records are handed to a background thread through a queue so file and console writes never block the event loop
+_log_queue = queue.SimpleQueue()
+_log_listener = QueueListener(
+    _log_queue,
+    logging.FileHandler('deep_research.log'),
+    logging.StreamHandler(),
+)
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('deep_research.log'),
-        logging.StreamHandler()
-    ]
+    handlers=[QueueHandler(_log_queue)]
 )
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logger = logging.getLogger(__name__)
 
 load_dotenv(override=True)
 
+REPORT_PLACEHOLDER = "*Report will appear here once research begins...*"
+
+# Raw HTML in model output is escaped rather than passed through to the gr.HTML component
+_markdown = MarkdownIt("commonmark", {"html": False}).enable("table")
+
 CUSTOM_CSS = """
 /* Light mode variables */
 :root {
@@ -147,6 +166,22 @@ body, .gradio-container {
     color: var(--win-muted);
     opacity: 0.7;
 }
+/* Report is rendered to HTML server-side */
+.app-shell .report-html,
+.app-shell .report-html p,
+.app-shell .report-html li,
+.app-shell .report-html td,
+.app-shell .report-html th {
+    color: var(--win-text);
+}
+.app-shell .report-html table {
+    border-collapse: collapse;
+}
+.app-shell .report-html th,
+.app-shell .report-html td {
+    border: 1px solid var(--win-stroke);
+    padding: 4px 8px;
+}
 
 .save-row {
     justify-content: flex-start;
@@ -559,6 +594,78 @@ div.run-btn .gr-button {
 """
 
 
+@lru_cache(maxsize=8)
+def _render_markdown(markdown: str) -> str:
+    return _markdown.render(markdown)
+
+
+def render_report(markdown: str) -> str:
+    """Render report markdown to HTML for the report panel."""
+    return _render_markdown(markdown)
+
+
+class _StreamingReport:
+    """Renders a report that grows at the end, re-parsing only the part that can still change.
+
+    Top-level blocks that a blank line separates from the block after them can no longer change,
+    so they are rendered once and only the text from the first open block on is parsed on each
+    update. The boundary comes from the parser, so lists, code fences and other blocks spanning
+    blank lines are never split; links to references defined on the other side of it only resolve
+    in the final render, which is of the whole document.
+    """
+
+    def __init__(self):
+        self._offset = 0
+        self._head_html = ""
+
+    def render(self, markdown: str) -> str:
+        tail = markdown[self._offset:]
+        env: dict = {}
+        tokens = _markdown.parse(tail, env)
+        lines = tail.split("\n")
+        split = None
+        for i, token in enumerate(tokens):
+            if token.level == 0 and token.nesting != -1 and token.map and token.map[0] > 0:
+                if not lines[token.map[0] - 1].strip():
+                    split = i
+        if split is not None:
+            line = tokens[split].map[0]
+            self._head_html += _markdown.renderer.render(tokens[:split], _markdown.options, env)
+            self._offset += sum(len(text) + 1 for text in lines[:line])
+            tokens = tokens[split:]
+        return self._head_html + _markdown.renderer.render(tokens, _markdown.options, env)
+
+
+# Bounded so a fast research task can run ahead of the UI without buffering unboundedly
+CHUNK_QUEUE_SIZE = 64
+# How long the consumer waits for a chunk before re-checking the producer
+CHUNK_POLL_TIMEOUT = 0.5
+# UI updates are held back until this much status text or time has accumulated
+STATUS_FLUSH_CHARS = 512
+STATUS_FLUSH_INTERVAL = 0.1
+_DONE = object()
+
+# Shared across runs so OpenAI connections are reused from one research request to the next
+research_manager = ResearchManager()
+
+
+@contextlib.asynccontextmanager
+async def _lifespan(app):
+    """Close the research manager on shutdown, on the server's event loop that its connections and tasks belong to."""
+    yield
+    await research_manager.aclose()
+
+
+async def _produce(query: str, num_searches: int, send_email: bool, queue: asyncio.Queue) -> None:
+    """Run the research manager and push its chunks onto the queue for the UI to drain."""
+    try:
+        async for chunk in research_manager.run(query, num_searches=num_searches, send_email=send_email):
+            await queue.put(chunk)
+    except Exception as e:
+        await queue.put(e)
+    await queue.put(_DONE)
+
+
 async def run(query: str, num_searches: float):
     # Ensure num_searches is within valid range (1-5)
     if num_searches is None:
@@ -567,52 +674,89 @@ async def run(query: str, num_searches: float):
     # Email sending is disabled - always set to False
     send_email = False
     logger.info(f"Starting research for query: {query}, num_searches: {num_searches}, send_email: {send_email}")
-    status_text = ""
-    report_text = "*Report will appear here once research begins...*"
+    status_parts: list[str] = []
+    report_text = render_report(REPORT_PLACEHOLDER)
     report_store = ""
+    streaming_report = _StreamingReport()
     
     # Initialize with empty status
-    yield status_text, report_text, report_store
+    yield "", report_text, report_store
     
+    # Text received since the last yield
+    pending_chars = 0
+    report_pending = False
+    last_flush = time.monotonic()
+
+    def should_flush() -> bool:
+        return pending_chars > STATUS_FLUSH_CHARS or time.monotonic() - last_flush > STATUS_FLUSH_INTERVAL
+
+    def flush():
+        nonlocal pending_chars, report_pending, last_flush, report_text
+        # Outputs that did not change are left untouched
+        report_update, store_update = gr.update(), gr.update()
+        if report_pending:
+            report_text = render_report(report_store) if done else streaming_report.render(report_store)
+            report_update, store_update = report_text, report_store
+        pending_chars = 0
+        report_pending = False
+        last_flush = time.monotonic()
+        return "".join(status_parts), report_update, store_update
+
+    queue: asyncio.Queue = asyncio.Queue(maxsize=CHUNK_QUEUE_SIZE)
+    producer = asyncio.create_task(_produce(query, num_searches, send_email, queue))
     try:
-        async for chunk in ResearchManager().run(query, num_searches=num_searches, send_email=send_email):
-            if not chunk or not chunk.strip():
+        done = False
+        while not done:
+            try:
+                # Wake up early while text is held back so it is not delayed past the flush interval
+                pending = pending_chars or report_pending
+                timeout = STATUS_FLUSH_INTERVAL if pending else CHUNK_POLL_TIMEOUT
+                batch = [await asyncio.wait_for(queue.get(), timeout=timeout)]
+            except asyncio.TimeoutError:
+                if pending_chars or report_pending:
+                    yield flush()
+                if producer.done() and queue.empty():
+                    break
                 continue
-            
-            # More precise report detection - only consider it a report if:
-            # 1. It starts with "# Report" (exact match)
-            # 2. OR it's long and has section-like markers
-            is_report = False
-            chunk_stripped = chunk.strip()
-            has_report_heading = chunk_stripped.startswith("# Report") or "# Report" in chunk
-            has_sections = chunk.count("## ") >= 2 or chunk.count("### ") >= 2
-            is_long_form = len(chunk_stripped) > 1200 or chunk.count("\n") >= 15
-            
-            if has_report_heading:
-                is_report = True
-            elif is_long_form and (has_sections or "**Query:**" in chunk or "## Findings" in chunk):
-                is_report = True
-            
-            if is_report:
-                # This is the report - replace the report content
-                report_text = chunk
-                report_store = chunk
-                yield status_text, report_text, report_store
-            else:
+            # Drain whatever else the producer queued meanwhile so it goes out in a single UI update
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+
+            for chunk in batch:
+                if chunk is _DONE:
+                    done = True
+                    break
+                if isinstance(chunk, Exception):
+                    raise chunk
+                if isinstance(chunk, ReportChunk):
+                    # Report text streams in pieces - append it to the report so far
+                    report_store += chunk
+                    report_pending = True
+                    continue
+                # Whitespace-only chunks are kept: streamed status text such as the report summary can
+                # arrive as a lone space or the blank line that ends it
+                if not chunk:
+                    continue
                 # This is a status update - append to status
-                status_text += chunk
-                # Always yield both status and report to update UI
-                yield status_text, report_text, report_store
+                status_parts.append(chunk)
+                pending_chars += len(chunk)
+
+            if (pending_chars or report_pending) and (done or should_flush()):
+                yield flush()
     except Exception as e:
         logger.error(f"Error in run function: {str(e)}", exc_info=True)
         error_msg = f"**Error:** {str(e)}\n\nPlease check the logs for more details."
-        yield status_text + "\n\n" + error_msg, report_text, report_store
+        if report_store:
+            report_text = render_report(report_store)
+        yield "".join(status_parts) + "\n\n" + error_msg, report_text, report_store
+    finally:
+        producer.cancel()
 
 
 def save_report(report_markdown: str):
     """Save the current report markdown to a temporary .md file and return its path for download."""
     try:
-        if not report_markdown or report_markdown.strip() == "*Report will appear here once research begins...*":
+        if not report_markdown or report_markdown.strip() == REPORT_PLACEHOLDER:
             return None
         tmp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".md", prefix="deep_research_report_")
         tmp_path = Path(tmp_file.name)
@@ -649,7 +793,7 @@ with gr.Blocks() as ui:
             with gr.Column(scale=1):
                 status = gr.Markdown(label="Status", value="**Ready to research**\n\nEnter a query and click Run to begin.")
             with gr.Column(scale=2):
-                report = gr.Markdown(label="Report", value="*Report will appear here once research begins...*")
+                report = gr.HTML(label="Report", value=render_report(REPORT_PLACEHOLDER), elem_classes=["report-html"])
         
         with gr.Row(elem_classes=["save-row"]):
             save_button = gr.Button("Save report", variant="secondary", elem_classes=["save-btn"], scale=0, min_width=0)
@@ -665,4 +809,8 @@ ui.launch(
     share=False,
     inbrowser=False,
     css=CUSTOM_CSS,
+    app_kwargs={"lifespan": _lifespan},
 )
+# launch() stops waiting for the server thread after a few seconds; let it finish shutting down the research manager
+if ui.server is not None:
+    ui.server.thread.join()
@@ -44,7 +44,6 @@ def send_email(subject: str, html_body: str) -> Dict[str, str]:
         logger.debug("Sending email via Mailjet API")
         result = mailjet.send.create(data=data)
         logger.info(f"Email response status code: {result.status_code}")
-        print("Email response", result.status_code)
         
         if result.status_code == 200:
             logger.info("Email sent successfully")
@@ -58,7 +57,6 @@ def send_email(subject: str, html_body: str) -> Dict[str, str]:
     except Exception as e:
         error_msg = f"Failed to send email: {str(e)}"
         logger.error(error_msg, exc_info=True)
-        print(error_msg)
         return {"status": "error", "message": error_msg}
 
 INSTRUCTIONS = """You are able to send a nicely formatted HTML email based on a detailed report.
@@ -0,0 +1,19 @@
+from pydantic import BaseModel, Field
+from agents import Agent
+
+INSTRUCTIONS = """You suggest follow-up research for a research request.
+You are given the request and summaries of the web searches done for it.
+Suggest 2-3 specific questions that the summaries leave open or that would be worth researching next.
+Base them only on the request and the summaries."""
+
+
+class FollowUpQuestions(BaseModel):
+    questions: list[str] = Field(description="Suggested topics to research further")
+
+
+follow_up_agent = Agent(
+    name="FollowUpAgent",
+    instructions=INSTRUCTIONS,
+    model="gpt-4o-mini",
+    output_type=FollowUpQuestions,
+)
@@ -1,3 +1,4 @@
+from contextvars import ContextVar
 from pydantic import BaseModel, Field
 from agents import Agent
 
@@ -28,9 +29,17 @@ class WebSearchItem(BaseModel):
 class WebSearchPlan(BaseModel):
     searches: list[WebSearchItem] = Field(description="A list of web searches to perform to best answer the query.")
     
+# Per-request instructions; each asyncio task sees its own value, so concurrent runs do not interfere
+planner_instructions: ContextVar[str | None] = ContextVar("planner_instructions", default=None)
+
+
+def _instructions(context, agent) -> str:
+    return planner_instructions.get() or INSTRUCTIONS
+
+
 planner_agent = Agent(
     name="PlannerAgent",
-    instructions=INSTRUCTIONS,
+    instructions=_instructions,
     model="gpt-4o-mini",
     output_type=WebSearchPlan,
 )
\ No newline at end of file
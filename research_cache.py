@@ -0,0 +1,160 @@
+import asyncio
+import hashlib
+import logging
+import os
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Protocol
+
+import diskcache
+import orjson
+from agents import Agent
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.getenv("RESEARCH_CACHE_DIR", ".cache")
+
+# A cached value and its absolute expiry timestamp (None = never expires)
+Entry = tuple[Any, float | None]
+
+
+def make_key(*parts: object) -> str:
+    """Build a stable cache key from the given parts."""
+    return hashlib.sha256("|".join(str(part) for part in parts).encode()).hexdigest()
+
+
+def llm_key(agent: Agent, input_text: str, *extra: object) -> str:
+    """Build the cache key for one agent call.
+
+    Args:
+        agent: The agent being run; its name and model are part of the key
+        input_text: The input passed to Runner.run
+        extra: Anything else that shapes the output, e.g. per-call instructions
+    """
+    payload = orjson.dumps(
+        {"agent": agent.name, "model": str(agent.model), "input": input_text, "extra": [str(part) for part in extra]},
+        option=orjson.OPT_SORT_KEYS,
+    )
+    return hashlib.sha256(payload).hexdigest()
+
+
+class CacheBackend(Protocol):
+    """Storage tier used by LLMCache."""
+
+    name: str
+    # True if get/set do I/O and should run off the event loop
+    blocking: bool
+
+    def get(self, key: str) -> Entry | None: ...
+
+    def set(self, key: str, value: Any, expires_at: float | None) -> None: ...
+
+
+class MemoryBackend:
+    """In-process LRU tier."""
+
+    name = "memory"
+    blocking = False
+
+    def __init__(self, maxsize: int = 256):
+        self._maxsize = maxsize
+        self._entries: OrderedDict[str, Entry] = OrderedDict()
+
+    def get(self, key: str) -> Entry | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, value: Any, expires_at: float | None) -> None:
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+
+class DiskBackend:
+    """Persistent tier on diskcache; survives restarts."""
+
+    name = "disk"
+    blocking = True
+
+    def __init__(self, directory: str):
+        self._disk = diskcache.Cache(directory)
+
+    def get(self, key: str) -> Entry | None:
+        value, expires_at = self._disk.get(key, expire_time=True)
+        return None if value is None else (value, expires_at)
+
+    def set(self, key: str, value: Any, expires_at: float | None) -> None:
+        self._disk.set(key, value, expire=expires_at - time.time() if expires_at else None)
+
+
+class LLMCache:
+    """Cache for agent results, checked tier by tier (by default an in-process LRU, then disk).
+
+    Hits in a slower tier are copied into the faster ones. Backend errors are logged and
+    otherwise ignored so a broken cache never fails a research run.
+    """
+
+    def __init__(self, name: str, maxsize: int = 256, directory: str | None = None, backends: list[CacheBackend] | None = None):
+        self.name = name
+        self.stats = {"hits": 0, "misses": 0, "tokens_saved": 0}
+        if backends is None:
+            backends = [MemoryBackend(maxsize)]
+            try:
+                backends.append(DiskBackend(os.path.join(directory or CACHE_DIR, name)))
+            except Exception as e:
+                logger.warning(f"Could not open disk cache '{name}', using memory only: {str(e)}")
+        self._backends = backends
+        # Entries disappear once no caller holds or waits on the lock
+        self._locks: weakref.WeakValueDictionary[str, asyncio.Lock] = weakref.WeakValueDictionary()
+
+    def lock(self, key: str) -> asyncio.Lock:
+        """Return the lock for key; hold it across get-compute-set so concurrent misses compute once."""
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        return lock
+
+    async def get(self, key: str) -> Any | None:
+        """Return the cached value for key, or None on a miss."""
+        for i, backend in enumerate(self._backends):
+            try:
+                entry = await asyncio.to_thread(backend.get, key) if backend.blocking else backend.get(key)
+            except Exception as e:
+                logger.warning(f"Cache '{self.name}' {backend.name} read failed: {str(e)}")
+                continue
+            if entry is None:
+                continue
+            value, expires_at = entry
+            for faster in self._backends[:i]:
+                if not faster.blocking:
+                    faster.set(key, value, expires_at)
+            self.stats["hits"] += 1
+            # Roughly four characters per token
+            self.stats["tokens_saved"] += len(str(value)) // 4
+            logger.info(
+                f"Cache '{self.name}' hit ({backend.name}), skipped ~{len(str(value)) // 4} output tokens "
+                f"[{self.stats['hits']} hits / {self.stats['misses']} misses]"
+            )
+            return value
+        self.stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, value: Any, expire: float | None = None) -> None:
+        """Store value under key in every tier, expiring after expire seconds (never if None)."""
+        expires_at = time.time() + expire if expire else None
+        for backend in self._backends:
+            try:
+                if backend.blocking:
+                    await asyncio.to_thread(backend.set, key, value, expires_at)
+                else:
+                    backend.set(key, value, expires_at)
+            except Exception as e:
+                logger.warning(f"Cache '{self.name}' {backend.name} write failed: {str(e)}")
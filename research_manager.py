@@ -1,17 +1,270 @@
-from agents import Runner, trace, gen_trace_id
-from search_agent import search_agent
-from planner_agent import planner_agent, WebSearchItem, WebSearchPlan
-from writer_agent import writer_agent, ReportData
-from critic_agent import critic_agent, CriticalAudit
-from email_agent import email_agent
+from agents import Agent, Runner, RunConfig, OpenAIProvider, trace, gen_trace_id
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+from search_agent import search_agent, SearchResult, INSTRUCTIONS_SHA as SEARCH_INSTRUCTIONS_SHA
+from planner_agent import planner_agent, planner_instructions, WebSearchItem, WebSearchPlan
+from follow_up_agent import follow_up_agent, FollowUpQuestions
+from writer_agent import writer_agent, ReportData, SummaryChunk, run_streaming, encode_report, decode_report, word_budget, WRITER_MODEL, WRITER_BASE_URL, INSTRUCTIONS_SHA as WRITER_INSTRUCTIONS_SHA
+from research_cache import LLMCache, llm_key
+from research_memory import ResearchMemory, Finding
+from agent_pool import AgentPool
+from async_timeout import timeout
+import orjson
 import asyncio
+import hashlib
+import httpx
 import logging
-from datetime import datetime, timezone
+import os
+import re
+import time
+from difflib import SequenceMatcher
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from critic_agent import CriticalAudit
 
 logger = logging.getLogger(__name__)
 
+# Progressive date filtering: (range name, constraint appended to the search term)
+DATE_RANGES = [
+    ("3 months", "last 3 months"),
+    ("12 months", "last 12 months"),
+    ("no limit", None),
+]
+# Seconds after a search starts at which each wider date range (12 months, no limit) is launched if no
+# narrower range has won yet; the 3-month range always starts at once. A wider range is only skipped when
+# the narrower ones are sufficient within its delay, and a hosted web search with its LLM call rarely
+# finishes in 2s, so the defaults mostly buy latency rather than save searches.
+# Set SEARCH_HEDGE_DELAYS="0,0" to race all ranges from the start (fastest, but pays for every range).
+SEARCH_HEDGE_DELAYS = [float(delay) for delay in os.getenv("SEARCH_HEDGE_DELAYS", "2,5").split(",")]
+if len(SEARCH_HEDGE_DELAYS) != len(DATE_RANGES) - 1:
+    raise ValueError(
+        f"SEARCH_HEDGE_DELAYS needs one delay per date range after the first ({len(DATE_RANGES) - 1}), got {len(SEARCH_HEDGE_DELAYS)}"
+    )
+
+# A search result counts as sufficient for its date range with at least this many sources and this confidence
+SEARCH_MIN_SOURCES = 2
+SEARCH_MIN_CONFIDENCE = 0.5
+
+# Seconds before the critic audit is abandoned and the report is written without feedback
+CRITIC_TIMEOUT = 30.0
+# Seconds (from when the writer starts) before the follow-up questions are dropped from the report
+FOLLOW_UP_TIMEOUT = 30.0
+# Upper bound for one planned search including all of its date-range attempts
+SEARCH_TIMEOUT = 120.0
+# Maximum search agent calls in flight at once per research run, to stay clear of API rate limits
+SEARCH_CONCURRENCY = int(os.getenv("SEARCH_CONCURRENCY", "8"))
+# Connection pool for OpenAI API calls; idle connections are kept open so later calls skip the TCP/TLS handshake
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "32"))
+OPENAI_KEEPALIVE_EXPIRY = 75.0
+
+# Cached search summaries live longer the wider their date range, since older sources change less
+SEARCH_CACHE_TTL = {
+    "3 months": 24 * 3600,
+    "12 months": 3 * 24 * 3600,
+    "no limit": 7 * 24 * 3600,
+}
+# A date range that came back insufficient is remembered too, so repeat runs go straight to the wider
+# ranges; only briefly, since new sources may turn up
+INSUFFICIENT_SEARCH_CACHE_TTL = 6 * 3600
+# Cached in place of a summary for a date range that came back insufficient
+_INSUFFICIENT = ""
+PLAN_CACHE_TTL = 24 * 3600
+REPORT_CACHE_TTL = 24 * 3600
+
+_search_cache = LLMCache("search")
+_plan_cache = LLMCache("plans")
+_report_cache = LLMCache("reports")
+_critic_cache = LLMCache("critic")
+_memory = ResearchMemory()
+
+
+# Words ignored when comparing planned queries; recency terms are included because the
+# planner is told to add them to every query, so they carry no distinguishing signal
+_QUERY_STOPWORDS = frozenset({
+    "a", "an", "and", "the", "of", "for", "in", "on", "to", "with", "about", "what", "is", "are",
+    "latest", "current", "recent", "newest", "most", "new", "up", "date", "updates", "update",
+})
+# Planned queries at least this similar (0-1, word-level over their sorted significant words) count as duplicates
+QUERY_SIMILARITY_THRESHOLD = 0.9
+
+
+def _query_key(query: str) -> tuple[str, ...]:
+    return tuple(sorted({word for word in re.findall(r"\w+", query.lower()) if word not in _QUERY_STOPWORDS}))
+
+
+def _dedupe_searches(searches: list[WebSearchItem]) -> list[WebSearchItem]:
+    """Drop planned searches whose query duplicates or nearly duplicates an earlier one."""
+    by_key: dict[tuple[str, ...], WebSearchItem] = {}
+    for item in searches:
+        by_key.setdefault(_query_key(item.query), item)
+    unique: list[WebSearchItem] = []
+    kept_keys: list[tuple[str, ...]] = []
+    for key, item in by_key.items():
+        if any(SequenceMatcher(None, key, kept).ratio() >= QUERY_SIMILARITY_THRESHOLD for kept in kept_keys):
+            continue
+        unique.append(item)
+        kept_keys.append(key)
+    return unique
+
+
+_MODELS_USED = (
+    "- gpt-4o-mini (all agents)" if WRITER_MODEL == "gpt-4o-mini"
+    else f"- gpt-4o-mini (planner, search, critic and email agents)\n- {WRITER_MODEL} (writer agent)"
+)
+# Search summaries whose SimHash fingerprints differ in at most this many of 64 bits count as near-duplicates
+SUMMARY_SIMHASH_DISTANCE = 3
+
+
+def _simhash(text: str) -> int:
+    """64-bit SimHash of the word 3-shingles of text; similar texts get fingerprints a few bits apart."""
+    words = re.findall(r"\w+", text.lower())
+    weights = [0] * 64
+    for i in range(max(1, len(words) - 2)):
+        digest = hashlib.blake2b(" ".join(words[i:i + 3]).encode(), digest_size=8).digest()
+        shingle_hash = int.from_bytes(digest, "big")
+        for bit in range(64):
+            weights[bit] += 1 if shingle_hash >> bit & 1 else -1
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+
+def _dedupe_summaries(summaries: list[str]) -> list[str]:
+    """Drop search summaries that nearly duplicate another one, keeping the longest; order is preserved."""
+    fingerprints = [_simhash(summary) for summary in summaries]
+    kept: list[int] = []
+    for i in sorted(range(len(summaries)), key=lambda i: len(summaries[i]), reverse=True):
+        if all((fingerprints[i] ^ fingerprints[j]).bit_count() > SUMMARY_SIMHASH_DISTANCE for j in kept):
+            kept.append(i)
+    return [summaries[i] for i in sorted(kept)]
+
+
+# Report footer, pre-split around the only two fields that vary: the date and the research request
+_SIG_PREFIX = "\n\n---\n\n## Report Signature\n\n**Date:** "
+_SIG_MID = "\n\n**Research Request:** "
+_SIG_SUFFIX = f"""
+
+**Agents Used:**
+- Planner Agent (search strategy planning)
+- Search Agent (web research with progressive date filtering)
+- Writer Agent (report synthesis)
+- Critic Agent (critical audit and validation)
+- Follow-up Agent (follow-up research questions)
+- Email Agent (report delivery)
+
+**Tools Used:**
+- SERPER Web Search API (progressive date filtering: 3 months → 12 months → no limit)
+- Mailjet Email API
+
+**Models Used:**
+{_MODELS_USED}
+
+---
+
+*Report generated by Deep Researcher*
+"""
+
+
+def _follow_up_section(questions: list[str]) -> str:
+    """Markdown section listing the follow-up questions after the report body; empty if there are none."""
+    if not questions:
+        return ""
+    return "\n\n## Suggested Follow-up Questions\n\n" + "".join(f"- {question}\n" for question in questions)
+
+
+def _build_search_critic() -> Agent:
+    """Critic that reviews the search results as plain-text feedback for the writer."""
+    return Agent(
+        name="Critic Agent",
+        instructions="""You are a Senior Research Critic. The input is a JSON object with the research "query" and a list of "search_results", each a summary of one web search.
+Review the search results and provide critical feedback:
+1. Identify gaps or missing information
+2. Note any unproven assumptions in the search results
+3. Suggest what additional information might be needed
+4. Highlight any marketing claims vs technical facts
+
+Provide your feedback in 2-3 paragraphs, focusing on what the writer should be aware of when creating the report.""",
+        model="gpt-4o-mini",
+    )
+
+
+def _content_start(text: str) -> int:
+    """Index of the first non-whitespace character in text (len(text) if there is none), without copying it."""
+    i = 0
+    n = len(text)
+    while i < n and text[i] in " \t\r\n":
+        i += 1
+    return i
+
+
+class ReportChunk(str):
+    """A piece of report text yielded by ResearchManager.run.
+
+    Everything else run() yields is a status update; consumers append report chunks to the report shown so far.
+    """
+
+
 class ResearchManager:
 
+    def __init__(self):
+        self._agents = AgentPool()
+        logger.info(f"Search agent instructions sha256: {SEARCH_INSTRUCTIONS_SHA}")
+        logger.info(f"Writer agent instructions sha256: {WRITER_INSTRUCTIONS_SHA}")
+        # Strong references to fire-and-forget tasks, so they are not garbage collected mid-flight
+        self._background_tasks: set[asyncio.Task] = set()
+        self._http_client: httpx.AsyncClient | None = None
+        self._run_config: RunConfig | None = None
+        self._writer_run_config: RunConfig | None = None
+
+    def _get_run_config(self) -> RunConfig:
+        """Run config routing every agent call through this manager's pooled OpenAI client.
+
+        Created on first use so the OpenAI key only has to be set once research starts.
+        """
+        if self._run_config is None:
+            self._http_client = DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=OPENAI_MAX_CONNECTIONS,
+                    max_keepalive_connections=OPENAI_MAX_CONNECTIONS,
+                    keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY,
+                ),
+            )
+            client = AsyncOpenAI(http_client=self._http_client)
+            self._run_config = RunConfig(model_provider=OpenAIProvider(openai_client=client))
+        return self._run_config
+
+    def _get_writer_run_config(self) -> RunConfig:
+        """Run config for the writer agent: the shared one, unless WRITER_BASE_URL points the writer elsewhere."""
+        if WRITER_BASE_URL is None:
+            return self._get_run_config()
+        if self._writer_run_config is None:
+            self._get_run_config()
+            client = AsyncOpenAI(
+                base_url=WRITER_BASE_URL,
+                api_key=os.getenv("WRITER_API_KEY") or os.getenv("OPENAI_API_KEY"),
+                http_client=self._http_client,
+            )
+            # Self-hosted OpenAI-compatible servers generally implement chat completions, not the Responses API
+            self._writer_run_config = RunConfig(model_provider=OpenAIProvider(openai_client=client, use_responses=False))
+        return self._writer_run_config
+
+    async def aclose(self) -> None:
+        """Wait for background work such as a pending email, then close the pooled HTTP connections.
+
+        Must be awaited on the event loop the manager ran on (the UI calls it from the server's shutdown hook).
+        """
+        loop = asyncio.get_running_loop()
+        pending = [task for task in self._background_tasks if task.get_loop() is loop]
+        if len(pending) < len(self._background_tasks):
+            # Tasks of another event loop cannot be awaited from this one
+            logger.warning(f"Not waiting for {len(self._background_tasks) - len(pending)} background tasks from another event loop")
+        if pending:
+            logger.info(f"Waiting for {len(pending)} background tasks before shutting down")
+            await asyncio.gather(*pending, return_exceptions=True)
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+            self._run_config = None
+            self._writer_run_config = None
+
     async def run(self, query: str, num_searches: int = 3, send_email: bool = True):
         """Run the deep research process, yielding status updates and streaming the report.
         
@@ -29,21 +282,23 @@ class ResearchManager:
             logger.info(f"Starting research run with trace_id: {trace_id}, num_searches: {num_searches}, send_email: {send_email}")
             with trace(workflow_name, trace_id=trace_id):
                 trace_link = f"https://platform.openai.com/logs/trace?trace_id={trace_id}"
-                print("View workflow trace in OpenAI:")
-                print(f"  Trace ID: {trace_id}")
-                print(f"  URL: {trace_link}")
+                logger.info(f"View workflow trace in OpenAI: {trace_link}")
                 yield f"**View Workflow Trace:** [OpenAI Platform - Traces Tab]({trace_link})\n\n"
                 yield f"*Trace ID: `{trace_id}`*\n\n"
 
-                print("Starting research...")
                 logger.info("Starting research phase")
                 yield "**Starting research process...**\n\n"
 
                 try:
+                    known_findings = await _memory.search(query)
+                    if known_findings:
+                        logger.info(f"Found {len(known_findings)} related findings from earlier research")
+                        yield f"- Reusing {len(known_findings)} related findings from earlier research\n\n"
                     yield f"- **Agent: Planner Agent** - Planning search strategy for: *{query}*\n\n"
-                    search_plan = await self.plan_searches(query, num_searches)
-                    logger.info(f"Search plan created with {len(search_plan.searches)} searches")
-                    yield f"- **Planner Agent** completed - Generated {len(search_plan.searches)} search queries\n\n"
+                    search_plan = await self.plan_searches(query, num_searches, known_findings)
+                    total_searches = len(search_plan.searches)
+                    logger.info(f"Search plan created with {total_searches} searches")
+                    yield f"- **Planner Agent** completed - Generated {total_searches} search queries\n\n"
                     yield "**Starting search phase...**\n\n"
                 except Exception as e:
                     logger.error(f"Error in plan_searches: {str(e)}", exc_info=True)
@@ -51,14 +306,30 @@ class ResearchManager:
                     raise
 
                 try:
-                    yield f"- **Agent: Search Agent** - Performing {len(search_plan.searches)} parallel searches...\n\n"
-
-                    for i, item in enumerate(search_plan.searches, 1):
-                        yield f"  - Search {i}/{len(search_plan.searches)}: *{item.query}*\n"
+                    yield f"- **Agent: Search Agent** - Performing {total_searches} parallel searches...\n\n"
+                    yield "".join(f"  - Search {i}/{total_searches}: *{item.query}*\n" for i, item in enumerate(search_plan.searches, 1))
 
-                    search_results = await self.perform_searches(search_plan)
+                    # Report each search as it lands instead of going quiet until the slowest one is done
+                    progress = asyncio.Queue()
+                    searching = asyncio.create_task(self.perform_searches(search_plan, progress))
+                    try:
+                        num_done = 0
+                        while (item := await progress.get()) is not None:
+                            num_done += 1
+                            yield f"  - Finished {num_done}/{total_searches}: *{item.query}*\n"
+                        search_results = await searching
+                    finally:
+                        # The searches run in their own task; if run() is cancelled or closed early, stop them too
+                        if not searching.done():
+                            searching.cancel()
+                            await asyncio.gather(searching, return_exceptions=True)
 
                     logger.info(f"Completed searches, got {len(search_results)} results")
+                    # Overlapping searches often summarize the same sources; the critic and writer only need them once
+                    unique_results = _dedupe_summaries(search_results)
+                    if len(unique_results) < len(search_results):
+                        logger.info(f"Dropped {len(search_results) - len(unique_results)} near-duplicate search results")
+                        search_results = unique_results
                     yield f"- **Search Agent** completed - Collected {len(search_results)} search results\n\n"
                     yield "**Starting critical audit phase...**\n\n"
                 except Exception as e:
@@ -70,18 +341,13 @@ class ResearchManager:
                 critic_feedback = None
                 try:
                     yield "- **Agent: Critic Agent** - Auditing search results and identifying gaps...\n\n"
-                    import asyncio
                     try:
-                        # Create a simple summary of search results for the critic
-                        search_summary = "\n\n".join([f"Search Result {i+1}:\n{result}" for i, result in enumerate(search_results)])
-                        critic_feedback = await asyncio.wait_for(
-                            self.audit_search_results(query, search_summary),
-                            timeout=30.0  # 30 second timeout
-                        )
+                        async with timeout(CRITIC_TIMEOUT):
+                            critic_feedback = await self.audit_search_results(query, search_results)
                         logger.info("Critic agent completed successfully")
                         yield f"- **Critic Agent** completed - Critical feedback generated\n\n"
                     except asyncio.TimeoutError:
-                        logger.warning("Critic agent timed out after 30 seconds, continuing without feedback")
+                        logger.warning(f"Critic agent timed out after {CRITIC_TIMEOUT:.0f} seconds, continuing without feedback")
                         yield "- **Critic Agent** timed out - Continuing without critical feedback\n\n"
                         critic_feedback = None
                     except Exception as e:
@@ -96,27 +362,61 @@ class ResearchManager:
                 try:
                     yield "**Starting report writing phase...**\n\n"
                     yield "- **Agent: Writer Agent** - Synthesizing research findings into comprehensive report...\n\n"
-                    report = await self.write_report(query, search_results, critic_feedback)
+                    report = None
+                    # Report text is held back until we know whether it already starts with a heading
+                    head = ""
+                    header_checked = False
+                    # The summary is written before the report, so it is shown as a status while the report is still coming
+                    summary_open = False
+                    async for piece in self.write_report(query, search_results, critic_feedback):
+                        if isinstance(piece, ReportData):
+                            report = piece
+                            continue
+                        if isinstance(piece, SummaryChunk):
+                            if not summary_open:
+                                summary_open = True
+                                yield "- **Summary:** "
+                            yield str(piece)
+                            continue
+                        if summary_open:
+                            summary_open = False
+                            yield "\n\n"
+                        if not header_checked:
+                            head += piece
+                            start = _content_start(head)
+                            if len(head) - start < len("# Report"):
+                                continue
+                            header_checked = True
+                            if not head.startswith("# Report", start):
+                                yield ReportChunk("# Report\n\n")
+                            piece = head
+                        yield ReportChunk(piece)
+                    if summary_open:
+                        yield "\n\n"
+                    if not header_checked and (start := _content_start(head)) < len(head):
+                        if not head.startswith("# Report", start):
+                            yield ReportChunk("# Report\n\n")
+                        yield ReportChunk(head)
                     logger.info("Report written successfully")
-                    final_report = report.markdown_report
-                    display_report = final_report
-                    if display_report and not display_report.strip().startswith("# Report"):
-                        display_report = f"# Report\n\n{display_report}"
-                    yield f"- **Writer Agent** completed - Report generated ({len(final_report)} characters)\n\n"
-                    
-                    # Add signature
-                    final_report_with_signature = self._add_report_signature(final_report, query)
-                    signature_only = self._add_report_signature("", query).lstrip()
-                    display_report_with_signature = display_report + "\n\n" + signature_only
-                    
+                    await _memory.add(query, report.short_summary)
+
+                    # The signature is streamed in its own chunks and only joined to the report text for the
+                    # email, so no second full copy of the report is built when email is off
+                    signature = self._signature_chunks(query)
+                    follow_ups = _follow_up_section(report.follow_up_questions)
+
+                    # The report is final - start the email now so it overlaps with delivering the rest to the UI
+                    email_task = None
                     if send_email:
-                        yield "**Report ready - streaming to you now (email will send next)...**\n\n"
-                    else:
-                        yield "**Report ready - streaming to you now...**\n\n"
-                    yield display_report_with_signature
-                    
-                    # Update report object with signature
-                    report.markdown_report = final_report_with_signature
+                        email_task = asyncio.create_task(self.send_email(report, (follow_ups, *signature)))
+                        self._background_tasks.add(email_task)
+                        email_task.add_done_callback(self._background_tasks.discard)
+
+                    if follow_ups:
+                        yield ReportChunk(follow_ups)
+                    for chunk in signature:
+                        yield ReportChunk(chunk)
+                    yield f"- **Writer Agent** completed - Report generated ({len(report.markdown_report)} characters)\n\n"
                     
                     if send_email:
                         yield "**Starting email phase...**\n\n"
@@ -128,7 +428,7 @@ class ResearchManager:
                 if send_email:
                     try:
                         yield "- **Agent: Email Agent** - Formatting and sending report via email...\n\n"
-                        await self.send_email(report)
+                        await email_task
                         logger.info("Email sent successfully")
                         yield "- **Email Agent** completed - Report sent successfully\n\n"
                         yield "**Research process complete!**\n\n"
@@ -143,20 +443,20 @@ class ResearchManager:
             yield f"**Fatal Error:** {str(e)}\n\nPlease check the logs for more details."
 
 
-    async def plan_searches(self, query: str, num_searches: int = 3) -> WebSearchPlan:
+    async def plan_searches(self, query: str, num_searches: int = 3, known_findings: list[Finding] | None = None) -> WebSearchPlan:
         """Plan the searches to perform for the query.
         
         Args:
             query: The research query
             num_searches: Number of search queries to generate (1-5)
+            known_findings: Related findings from earlier research; the planner aims searches at what they leave open
         """
         # Ensure num_searches is within valid range
         num_searches = max(1, min(5, int(num_searches)))
         logger.info(f"Planning {num_searches} searches for query: {query}")
-        print(f"Planning {num_searches} searches...")
+        known_findings = known_findings or []
         try:
             # Create dynamic instructions for the planner agent
-            from planner_agent import planner_agent
             instructions = f"""You are a research planning assistant that creates web search queries.
 
 CRITICAL RULES:
@@ -173,134 +473,224 @@ CRITICAL RULES:
 
 Your searches should ensure the research is based on up-to-date information, not outdated sources. Always use relative time references, never hardcoded years.
 IMPORTANT: You must generate EXACTLY {num_searches} search queries."""
-            
-            # Temporarily update planner agent instructions
-            original_instructions = planner_agent.instructions
-            planner_agent.instructions = instructions
-            
+            if known_findings:
+                known = "\n".join(f"- {finding.query}: {finding.summary}" for finding in known_findings)
+                instructions += f"""
+
+KNOWN FINDINGS from earlier research on related requests:
+{known}
+
+Do not spend searches re-establishing these findings. Use them to target gaps, open questions and anything that may have changed since."""
+
+            input_text = f"Query: {query}\n\nGenerate EXACTLY {num_searches} search queries."
+            # Case and spacing of the query do not change the plan, so they do not split the cache either
+            normalized_query = " ".join(query.lower().split())
+            cache_key = llm_key(planner_agent, normalized_query, num_searches, instructions)
+            cached = await _plan_cache.get(cache_key)
+            if cached is not None:
+                logger.info("Using cached search plan")
+                return WebSearchPlan.model_validate_json(cached)
+
+            token = planner_instructions.set(instructions)
             try:
-                result = await Runner.run(
-                    planner_agent,
-                    f"Query: {query}\n\nGenerate EXACTLY {num_searches} search queries.",
-                )
-                plan = result.final_output_as(WebSearchPlan)
-                
-                # Ensure we have the correct number of searches
-                if len(plan.searches) != num_searches:
-                    logger.warning(f"Planner generated {len(plan.searches)} searches, expected {num_searches}. Adjusting...")
-                    if len(plan.searches) > num_searches:
-                        plan.searches = plan.searches[:num_searches]
-                    # If fewer, we'll use what we have (planner might have had a good reason)
-                
-                logger.info(f"Will perform {len(plan.searches)} searches")
-                print(f"Will perform {len(plan.searches)} searches")
-                return plan
+                result = await Runner.run(planner_agent, input_text, run_config=self._get_run_config())
             finally:
-                # Restore original instructions
-                planner_agent.instructions = original_instructions
+                planner_instructions.reset(token)
+            plan = result.final_output_as(WebSearchPlan)
+
+            unique = _dedupe_searches(plan.searches)
+            if len(unique) < len(plan.searches):
+                logger.info(f"Dropped {len(plan.searches) - len(unique)} duplicate search queries")
+                plan.searches = unique
+            
+            # Ensure we have the correct number of searches
+            if len(plan.searches) != num_searches:
+                logger.warning(f"Planner generated {len(plan.searches)} searches, expected {num_searches}. Adjusting...")
+                if len(plan.searches) > num_searches:
+                    plan.searches = plan.searches[:num_searches]
+                # If fewer, we'll use what we have (planner might have had a good reason)
+            
+            logger.info(f"Will perform {len(plan.searches)} searches")
+            await _plan_cache.set(cache_key, plan.model_dump_json(), expire=PLAN_CACHE_TTL)
+            return plan
         except Exception as e:
             logger.error(f"Error in plan_searches: {str(e)}", exc_info=True)
             raise
 
-    async def perform_searches(self, search_plan: WebSearchPlan) -> list[str]:
-        """Perform the searches to perform for the query."""
+    async def perform_searches(self, search_plan: WebSearchPlan, progress: asyncio.Queue | None = None) -> list[str]:
+        """Perform the searches to perform for the query.
+
+        Args:
+            search_plan: The planned searches
+            progress: Optional queue that receives each WebSearchItem as its search finishes, then None
+        """
         logger.info(f"Performing {len(search_plan.searches)} searches")
-        print("Searching...")
+        # Limits this run's search agent calls only; the manager is shared, so a global limit would throttle every user together
+        slots = asyncio.Semaphore(SEARCH_CONCURRENCY)
+
+        # Identical queries share one in-flight search; every planned item still gets its progress event
+        unique: dict[str, asyncio.Task] = {}
+        tasks: dict[asyncio.Task, list[WebSearchItem]] = {}
+        for item in search_plan.searches:
+            key = " ".join(item.query.lower().split())
+            if key not in unique:
+                unique[key] = asyncio.create_task(self._search_with_timeout(item, slots))
+                tasks[unique[key]] = []
+            tasks[unique[key]].append(item)
+        if len(tasks) < len(search_plan.searches):
+            logger.info(f"Collapsed {len(search_plan.searches) - len(tasks)} duplicate searches")
 
         num_completed = 0
-        tasks = [asyncio.create_task(self.search(item)) for item in search_plan.searches]
-        results = []
-        for task in asyncio.as_completed(tasks):
-            try:
-                result = await task
-                if result is not None:
-                    results.append(result)
-                    logger.debug("Search completed successfully")
-                else:
+
+        def on_done(task: asyncio.Task) -> None:
+            nonlocal num_completed
+            for item in tasks[task]:
+                num_completed += 1
+                logger.debug(f"Searching... {num_completed}/{len(search_plan.searches)} completed")
+                if progress is not None:
+                    progress.put_nowait(item)
+
+        for task in tasks:
+            task.add_done_callback(on_done)
+
+        try:
+            results = []
+            for outcome in await asyncio.gather(*tasks, return_exceptions=True):
+                if isinstance(outcome, str):
+                    results.append(outcome)
+                elif outcome is None:
                     logger.warning("Search returned None result")
-            except Exception as e:
-                logger.error(f"Error waiting for search task: {str(e)}", exc_info=True)
-            num_completed += 1
-            print(f"Searching... {num_completed}/{len(tasks)} completed")
+                else:
+                    logger.error(f"Error waiting for search task: {str(outcome)}", exc_info=outcome)
+        finally:
+            if progress is not None:
+                progress.put_nowait(None)
         logger.info(f"Finished searching, collected {len(results)} results")
-        print("Finished searching")
         return results
 
-    async def search(self, item: WebSearchItem) -> str | None:
+    async def _search_with_timeout(self, item: WebSearchItem, slots: asyncio.Semaphore) -> str | None:
+        async with timeout(SEARCH_TIMEOUT):
+            return await self.search(item, slots)
+
+    async def search(self, item: WebSearchItem, slots: asyncio.Semaphore | None = None) -> str | None:
         """Perform a search for the query with progressive date filtering.
         
         Tries progressively wider date ranges: 3 months -> 12 months -> no limit.
-        Returns the first successful result or None if all attempts fail.
+        Wider ranges are started speculatively after a short delay (see SEARCH_HEDGE_DELAYS), or
+        immediately once every narrower range came back insufficient, so a query that needs a wide
+        range does not pay for each narrower attempt in turn. The narrowest sufficient result wins
+        and attempts still running are cancelled.
+        Returns None if all attempts fail.
+
+        Args:
+            item: The planned search
+            slots: Limits concurrent search agent calls; perform_searches shares one across a run
         """
-        base_query = item.query
-        
-        # Progressive date filtering: try 3 months, then 12 months, then no limit
-        date_ranges = [
-            ("3 months", "last 3 months"),
-            ("12 months", "last 12 months"),
-            ("no limit", None)
-        ]
-        
-        for range_name, date_constraint in date_ranges:
-            if date_constraint:
-                # Add date constraint to query
-                search_query = f"{base_query} {date_constraint}"
-                input_text = f"Search term: {search_query}\nReason for searching: {item.reason}\n\nIMPORTANT: Focus on finding sources from the {range_name}. If you find sufficient relevant results (2+ sources), provide your summary. If results are insufficient, indicate this clearly in your response."
-            else:
-                # No date constraint for final attempt
-                search_query = base_query
-                input_text = f"Search term: {search_query}\nReason for searching: {item.reason}\n\nIMPORTANT: Search without date restrictions. Use any relevant sources found, even if older. Explicitly note in your summary that recent information was limited."
-            
-            logger.debug(f"Searching: {search_query} (reason: {item.reason}, date range: {range_name})")
-            try:
-                result = await Runner.run(
-                    search_agent,
-                    input_text,
-                )
-                output = str(result.final_output)
-                
-                # Check if we got meaningful results
-                if output and len(output.strip()) > 50:
-                    # Check if output explicitly indicates insufficient results
-                    insufficient_indicators = [
-                        "no recent information found",
-                        "no information found",
-                        "insufficient results",
-                        "no relevant sources",
-                        "could not find"
-                    ]
-                    has_sufficient_results = not any(
-                        indicator.lower() in output.lower() 
-                        for indicator in insufficient_indicators
-                    )
-                    
-                    # If we have sufficient results, or this is our final attempt, use it
-                    if has_sufficient_results or range_name == "no limit":
-                        logger.debug(f"Search completed for: {base_query} (used {range_name} range)")
+        if slots is None:
+            slots = asyncio.Semaphore(SEARCH_CONCURRENCY)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        attempts: list[asyncio.Task] = []
+        try:
+            while True:
+                # Walk the ranges narrowest first; a running attempt must finish before a wider one may win
+                for task in attempts:
+                    if not task.done():
+                        break
+                    output = task.result()
+                    if output is not None:
                         return output
-                    else:
-                        # Results were insufficient, try next date range
-                        logger.debug(f"Insufficient results for {base_query} with {range_name} range, trying next range")
-                        continue
                 else:
-                    # Very short output, try next range
-                    logger.debug(f"Short output for {base_query} with {range_name} range, trying next range")
+                    if len(attempts) == len(DATE_RANGES):
+                        break
+                    # Everything started so far was insufficient - no point waiting for the hedge delay
+                    attempts.append(asyncio.create_task(self._search_range(item, *DATE_RANGES[len(attempts)], slots)))
                     continue
-                    
+
+                hedge_wait = None
+                if len(attempts) < len(DATE_RANGES):
+                    hedge_wait = max(0.0, started + SEARCH_HEDGE_DELAYS[len(attempts) - 1] - loop.time())
+                pending = [task for task in attempts if not task.done()]
+                done, _ = await asyncio.wait(pending, timeout=hedge_wait, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # Narrower ranges are still running - hedge with the next wider one
+                    attempts.append(asyncio.create_task(self._search_range(item, *DATE_RANGES[len(attempts)], slots)))
+        finally:
+            for task in attempts:
+                task.cancel()
+
+        # If we exhausted all ranges without success, return None
+        logger.warning(f"All date ranges exhausted for query: {item.query}")
+        return None
+
+    async def _search_range(self, item: WebSearchItem, range_name: str, date_constraint: str | None, slots: asyncio.Semaphore) -> str | None:
+        """Run a single search attempt restricted to one date range, answering from the cache when possible.
+
+        Results are cached per query (case-insensitive) and range, including the finding that a range is
+        insufficient; failed searches are not cached. Concurrent attempts for the same query and range
+        wait on a per-key lock, so the search agent runs once and the rest hit the cache.
+        Returns the summary if it is usable for this range, otherwise None.
+        """
+        cache_key = llm_key(search_agent, item.query.casefold(), range_name)
+        async with _search_cache.lock(cache_key):
+            cached = await _search_cache.get(cache_key)
+            if cached is not None:
+                logger.debug(f"Using cached search result for: {item.query} ({range_name} range)")
+                return cached or None
+            try:
+                output = await self._run_search(item, range_name, date_constraint, slots)
             except Exception as e:
-                logger.error(f"Error in search for '{search_query}' with {range_name} range: {str(e)}", exc_info=True)
-                # If this is the last attempt, return None; otherwise continue to next range
-                if range_name == "no limit":
-                    return None
-                continue
+                logger.error(f"Error in search for '{item.query}' with {range_name} range: {str(e)}", exc_info=True)
+                return None
+            if output is None:
+                await _search_cache.set(cache_key, _INSUFFICIENT, expire=INSUFFICIENT_SEARCH_CACHE_TTL)
+            else:
+                await _search_cache.set(cache_key, output, expire=SEARCH_CACHE_TTL[range_name])
+            return output
+
+    async def _run_search(self, item: WebSearchItem, range_name: str, date_constraint: str | None, slots: asyncio.Semaphore) -> str | None:
+        """Call the search agent for one date range; returns the summary if it is usable for this range, otherwise None.
+
+        Errors from the agent call are raised, so they can be told apart from an insufficient range.
+        """
+        base_query = item.query
+        if date_constraint:
+            # Add date constraint to query
+            search_query = f"{base_query} {date_constraint}"
+            input_text = f"Search term: {search_query}\nReason for searching: {item.reason}\n\nIMPORTANT: Focus on finding sources from the {range_name}. If you find sufficient relevant results (2+ sources), provide your summary. If results are insufficient, say so through a low source_count and confidence."
+        else:
+            # No date constraint for final attempt
+            search_query = base_query
+            input_text = f"Search term: {search_query}\nReason for searching: {item.reason}\n\nIMPORTANT: Search without date restrictions. Use any relevant sources found, even if older. Explicitly note in your summary that recent information was limited."
         
-        # If we exhausted all ranges without success, return None
-        logger.warning(f"All date ranges exhausted for query: {base_query}")
+        logger.debug(f"Searching: {search_query} (reason: {item.reason}, date range: {range_name})")
+        async with slots:
+            result = await Runner.run(
+                search_agent,
+                input_text,
+                run_config=self._get_run_config(),
+            )
+        found = result.final_output_as(SearchResult)
+
+        # The agent judges sufficiency itself, with the sources in front of it
+        output = found.text.strip()
+        has_sufficient_results = found.source_count >= SEARCH_MIN_SOURCES and found.confidence >= SEARCH_MIN_CONFIDENCE
+
+        # Check if we got meaningful results
+        if len(output) <= 50:
+            logger.debug(f"Short output for {base_query} with {range_name} range")
+            return None
+        
+        # If we have sufficient results, or this is our final attempt, use it
+        if has_sufficient_results or date_constraint is None:
+            logger.debug(f"Search completed for: {base_query} (used {range_name} range)")
+            return output
+        logger.debug(f"Insufficient results for {base_query} with {range_name} range")
         return None
 
-    def _format_audit(self, audit: CriticalAudit) -> str:
+    def _format_audit(self, audit: "CriticalAudit") -> str:
         """Format the critical audit into markdown."""
-        audit_md = f"""
+        parts: list[str] = [f"""
 
 ---
 
@@ -311,38 +701,33 @@ IMPORTANT: You must generate EXACTLY {num_searches} search queries."""
 
 ### Confidence Score: {audit.confidence_score.score}/100
 
-{chr(10).join(f"- {point}" for point in audit.confidence_score.explanation)}
-
-### Unproven Assumptions
-
-"""
-        for i, assumption in enumerate(audit.unproven_assumptions, 1):
-            audit_md += f"""
+"""]
+        parts.extend(f"- {point}\n" for point in audit.confidence_score.explanation)
+        parts.append("\n### Unproven Assumptions\n\n")
+        parts.extend(f"""
 **Assumption {i}:**
 - **Claim:** {assumption.claim}
 - **Weakness:** {assumption.weakness}
 - **Required Evidence:** {assumption.required_evidence}
 
-"""
+""" for i, assumption in enumerate(audit.unproven_assumptions, 1))
 
-        audit_md += "\n### Marketing Claims vs Technical Reality\n\n"
-        for i, classification in enumerate(audit.capability_classifications, 1):
-            audit_md += f"""
+        parts.append("\n### Marketing Claims vs Technical Reality\n\n")
+        parts.extend(f"""
 **Capability {i}: {classification.capability}**
 - **Classification:** {classification.classification}
 - **Reasoning:** {classification.reasoning}
 
-"""
+""" for i, classification in enumerate(audit.capability_classifications, 1))
 
-        audit_md += "\n### Missing Critical Questions\n\n"
-        for i, question in enumerate(audit.missing_questions, 1):
-            audit_md += f"""
+        parts.append("\n### Missing Critical Questions\n\n")
+        parts.extend(f"""
 **Question {i}: {question.question}**
 - **Importance:** {question.importance}
 
-"""
+""" for i, question in enumerate(audit.missing_questions, 1))
 
-        audit_md += f"""
+        parts.append(f"""
 ### Agentic & MCP Readiness Assessment
 
 **Autonomous Agents Support:**
@@ -358,105 +743,114 @@ IMPORTANT: You must generate EXACTLY {num_searches} search queries."""
 {audit.agentic_readiness.missing_components}
 
 ---
-"""
-        return audit_md
+""")
+        return "".join(parts)
 
-    def _add_report_signature(self, markdown_report: str, query: str) -> str:
-        """Add a signature section to the report with metadata."""
-        signature = f"""
+    def _signature_chunks(self, query: str) -> tuple[str, ...]:
+        """The signature section as separate fragments, for streaming after the report body."""
+        now = time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime())
+        return (_SIG_PREFIX, now, _SIG_MID, query, _SIG_SUFFIX)
 
----
+    async def write_report(self, query: str, search_results: list[str], critic_feedback: str | None = None):
+        """Write the report for the query, optionally incorporating critic feedback.
 
-## Report Signature
-
-**Date:** {datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")}
-
-**Research Request:** {query}
-
-**Agents Used:**
-- Planner Agent (search strategy planning)
-- Search Agent (web research with progressive date filtering)
-- Writer Agent (report synthesis)
-- Critic Agent (critical audit and validation)
-- Email Agent (report delivery)
-
-**Tools Used:**
-- SERPER Web Search API (progressive date filtering: 3 months → 12 months → no limit)
-- Mailjet Email API
-
-**Models Used:**
-- gpt-4o-mini (all agents)
-
----
-
-*Report generated by Deep Researcher*
-"""
-        return markdown_report + signature
-
-    async def write_report(self, query: str, search_results: list[str], critic_feedback: str | None = None) -> ReportData:
-        """Write the report for the query, optionally incorporating critic feedback."""
+        Yields the short summary (as SummaryChunk) and then the markdown report text as the writer
+        generates them, then the complete ReportData.
+        """
         logger.info(f"Writing report for query: {query} with {len(search_results)} search results")
-        print("Thinking about report...")
-        
-        input_text = f"Original query: {query}\nSummarized search results: {search_results}"
         
+        parts = ["Original query: ", query, "\n\nSummarized search results:\n\n"]
+        parts.extend(f"### Result {i}\n{result}\n\n" for i, result in enumerate(search_results, 1))
         if critic_feedback:
-            input_text += f"\n\nCritical Feedback from Research Critic:\n{critic_feedback}\n\nPlease incorporate this critical feedback into your report. Address the gaps and concerns raised, and be explicit about any limitations or assumptions in your findings."
+            parts += ["Critical Feedback from Research Critic:\n", critic_feedback, "\n\nPlease incorporate this critical feedback into your report. Address the gaps and concerns raised, and be explicit about any limitations or assumptions in your findings.\n\n"]
+        # The length target goes in the input rather than the instructions, which stay fixed for prompt caching
+        min_words, max_words = word_budget("".join(search_results))
+        parts.append(f"Report length: {min_words}-{max_words} words.")
+        input_text = "".join(parts)
         
+        # The instructions hash is part of the key so editing the writer prompt invalidates old reports
+        cache_key = llm_key(writer_agent, input_text, WRITER_INSTRUCTIONS_SHA)
+        cached = await _report_cache.get(cache_key)
+        if cached is not None:
+            logger.info("Using cached report")
+            report = decode_report(cached)
+            yield SummaryChunk(report.short_summary)
+            yield report.markdown_report
+            yield report
+            return
+
+        # Follow-up questions come from a separate, much shorter call running alongside the writer,
+        # so the writer has fewer tokens to generate before the report is complete
+        follow_ups = asyncio.create_task(self.suggest_follow_ups(query, search_results))
         try:
-            result = await Runner.run(
-                writer_agent,
-                input_text,
-            )
-            report = result.final_output_as(ReportData)
+            report = None
+            async for piece in run_streaming(input_text, run_config=self._get_writer_run_config()):
+                if isinstance(piece, ReportData):
+                    report = piece
+                else:
+                    yield piece
+            report.follow_up_questions = await follow_ups
             
             logger.info("Report written successfully")
-            print("Finished writing report")
-            return report
+            await _report_cache.set(cache_key, encode_report(report), expire=REPORT_CACHE_TTL)
+            yield report
         except Exception as e:
             logger.error(f"Error in write_report: {str(e)}", exc_info=True)
             raise
+        finally:
+            follow_ups.cancel()
 
-    async def audit_search_results(self, query: str, search_summary: str) -> str:
-        """Audit the search results and provide critical feedback before writing the report."""
+    async def suggest_follow_ups(self, query: str, search_results: list[str]) -> list[str]:
+        """Suggest follow-up research questions; returns an empty list if the follow-up agent fails or times out."""
+        input_text = orjson.dumps({"query": query, "search_results": search_results}).decode()
+        try:
+            async with timeout(FOLLOW_UP_TIMEOUT):
+                result = await Runner.run(follow_up_agent, input_text, run_config=self._get_run_config())
+            return result.final_output_as(FollowUpQuestions).questions
+        except asyncio.TimeoutError:
+            logger.warning(f"Follow-up agent timed out after {FOLLOW_UP_TIMEOUT:.0f} seconds, report has no follow-up questions")
+            return []
+        except Exception as e:
+            logger.warning(f"Follow-up agent failed, report has no follow-up questions: {str(e)}")
+            return []
+
+    async def audit_search_results(self, query: str, search_results: list[str]) -> str:
+        """Audit the search results and provide critical feedback before writing the report.
+
+        The critic receives the query and results as one JSON document rather than a rendered summary.
+        """
         logger.info("Auditing search results...")
-        print("Auditing search results...")
+        payload = orjson.dumps({"query": query, "search_results": search_results}).decode()
         try:
             # Use a simpler approach - just get text feedback, not structured output
-            from agents import Agent
-            simple_critic = Agent(
-                name="Critic Agent",
-                instructions="""You are a Senior Research Critic. Review the search results and provide critical feedback:
-1. Identify gaps or missing information
-2. Note any unproven assumptions in the search results
-3. Suggest what additional information might be needed
-4. Highlight any marketing claims vs technical facts
-
-Provide your feedback in 2-3 paragraphs, focusing on what the writer should be aware of when creating the report.""",
-                model="gpt-4o-mini",
-            )
-            result = await Runner.run(
-                simple_critic,
-                f"Research Query: {query}\n\nSearch Results Summary:\n{search_summary}\n\nProvide critical feedback for the writer.",
-            )
+            simple_critic = self._agents.get("search_critic", _build_search_critic)
+            cache_key = llm_key(simple_critic, payload, simple_critic.instructions)
+            cached = await _critic_cache.get(cache_key)
+            if cached is not None:
+                logger.info("Using cached search results audit")
+                return cached
+
+            result = await Runner.run(simple_critic, payload, run_config=self._get_run_config())
             feedback = str(result.final_output)
             logger.info("Search results audit completed successfully")
-            print("Search results audit completed")
+            await _critic_cache.set(cache_key, feedback, expire=REPORT_CACHE_TTL)
             return feedback
         except Exception as e:
             logger.error(f"Error in audit_search_results: {str(e)}", exc_info=True)
             raise
 
-    async def send_email(self, report: ReportData) -> None:
+    async def send_email(self, report: ReportData, trailing: tuple[str, ...] = ()) -> None:
+        """Email the report, with the trailing fragments (follow-up questions, signature) appended."""
         logger.info("Sending email...")
-        print("Writing email...")
         try:
+            # Imported on first use: most runs never send email, and mailjet_rest is slow to import
+            from email_agent import email_agent
             result = await Runner.run(
                 email_agent,
-                report.markdown_report,
+                "".join((report.markdown_report, *trailing)),
+                run_config=self._get_run_config(),
             )
             logger.info("Email sent successfully")
-            print("Email sent")
             return report
         except Exception as e:
             logger.error(f"Error in send_email: {str(e)}", exc_info=True)
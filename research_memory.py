@@ -0,0 +1,110 @@
+import asyncio
+import logging
+import os
+import re
+import time
+
+import diskcache
+from pydantic import BaseModel, Field
+
+from research_cache import CACHE_DIR, make_key
+
+logger = logging.getLogger(__name__)
+
+# Findings older than this are forgotten
+MEMORY_TTL = 30 * 24 * 3600
+# Oldest findings are dropped once more than this many are stored
+MEMORY_MAX_ENTRIES = 500
+# Minimum word overlap (Jaccard, 0-1) between two queries for a finding to count as related
+MEMORY_MIN_SIMILARITY = 0.3
+
+_STOPWORDS = frozenset({
+    "a", "an", "and", "the", "of", "for", "in", "on", "to", "with", "about", "what", "is", "are",
+    "how", "does", "do", "latest", "current", "recent", "new", "newest",
+})
+
+
+class Finding(BaseModel):
+    query: str = Field(description="The research request the finding came from.")
+    summary: str = Field(description="Short summary of what that research found.")
+    created_at: float = Field(description="Unix timestamp of when the finding was stored.")
+
+
+def _normalize(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def _words(text: str) -> frozenset[str]:
+    return frozenset(word for word in re.findall(r"\w+", text.lower()) if word not in _STOPWORDS)
+
+
+class ResearchMemory:
+    """Persistent store of past research summaries, looked up by word overlap with the new query.
+
+    Like LLMCache, disk I/O runs off the event loop and disk errors are logged and otherwise ignored.
+    """
+
+    def __init__(self, directory: str | None = None):
+        try:
+            self._disk = diskcache.Cache(os.path.join(directory or CACHE_DIR, "memory"))
+        except Exception as e:
+            logger.warning(f"Could not open research memory, findings will not be reused: {str(e)}")
+            self._disk = None
+
+    async def search(self, query: str, limit: int = 5) -> list[Finding]:
+        """Return up to limit stored findings related to query, most similar first.
+
+        The finding of an earlier run of the same request is left out: its summary differs from run
+        to run, so feeding it to the planner would keep that request's plan from ever being cached.
+        """
+        return await asyncio.to_thread(self._search, query, limit)
+
+    def _search(self, query: str, limit: int) -> list[Finding]:
+        if self._disk is None:
+            return []
+        normalized = _normalize(query)
+        words = _words(query)
+        if not words:
+            return []
+        scored = []
+        try:
+            for key in self._disk.iterkeys():
+                data = self._disk.get(key)
+                if data is None:
+                    continue
+                finding = Finding.model_validate(data)
+                if _normalize(finding.query) == normalized:
+                    continue
+                other = _words(finding.query)
+                score = len(words & other) / len(words | other)
+                if score >= MEMORY_MIN_SIMILARITY:
+                    scored.append((score, finding))
+        except Exception as e:
+            logger.warning(f"Research memory lookup failed: {str(e)}")
+            return []
+        scored.sort(key=lambda pair: pair[0], reverse=True)
+        return [finding for _, finding in scored[:limit]]
+
+    async def add(self, query: str, summary: str) -> None:
+        """Remember the summary of a finished research run."""
+        await asyncio.to_thread(self._add, query, summary)
+
+    def _add(self, query: str, summary: str) -> None:
+        if self._disk is None or not summary.strip():
+            return
+        finding = Finding(query=query, summary=summary.strip(), created_at=time.time())
+        try:
+            self._disk.set(make_key(_normalize(query)), finding.model_dump(), expire=MEMORY_TTL)
+            if len(self._disk) > MEMORY_MAX_ENTRIES:
+                self._forget_oldest(len(self._disk) - MEMORY_MAX_ENTRIES)
+        except Exception as e:
+            logger.warning(f"Research memory write failed: {str(e)}")
+
+    def _forget_oldest(self, count: int) -> None:
+        entries = []
+        for key in self._disk.iterkeys():
+            data = self._disk.get(key)
+            if data is not None:
+                entries.append((data["created_at"], key))
+        for _, key in sorted(entries)[:count]:
+            self._disk.delete(key)
@@ -1,6 +1,11 @@
+import hashlib
+import re
+import textwrap
+
+from pydantic import BaseModel, Field
 from agents import Agent, WebSearchTool, ModelSettings
 
-INSTRUCTIONS = """You are a research assistant that performs live web searches using SERPER.
+_RAW_INSTRUCTIONS = """You are a research assistant that performs live web searches using SERPER.
 
 CRITICAL RULES:
 1. You MUST use the SERPER web search tool for EVERY query - never rely on pre-existing knowledge
@@ -48,8 +53,22 @@ CRITICAL RULES:
    - Capture main points relevant to the query, ignore fluff
 
 7. Output:
-   - Only provide the summary itself, no additional commentary
-   - Always mention the time range of sources used (3 months, 12 months, or older) using relative time references"""
+   - Put only the summary itself in "text", no additional commentary
+   - Always mention the time range of sources used (3 months, 12 months, or older) using relative time references
+   - Set "source_count" to the number of distinct relevant sources the summary is based on
+   - Set "confidence" to how well those sources answer the search for the requested date range (0.0-1.0)"""
+
+# Normalized once at import: no stray indentation or trailing whitespace is sent as prompt tokens, and the
+# prefix stays byte-identical between calls and deploys so OpenAI's prompt cache can reuse it
+INSTRUCTIONS = re.sub(r"[ \t]+\n", "\n", textwrap.dedent(_RAW_INSTRUCTIONS).strip())
+INSTRUCTIONS_SHA = hashlib.sha256(INSTRUCTIONS.encode()).hexdigest()
+
+
+class SearchResult(BaseModel):
+    text: str = Field(description="The summary of the search results.")
+    source_count: int = Field(description="Number of distinct relevant sources the summary is based on.")
+    confidence: float = Field(description="How well the sources answer the search for the requested date range, from 0.0 to 1.0.")
+
 
 search_agent = Agent(
     name="Search agent",
@@ -57,4 +76,5 @@ search_agent = Agent(
     tools=[WebSearchTool(search_context_size="low")],
     model="gpt-4o-mini",
     model_settings=ModelSettings(tool_choice="required"),
+    output_type=SearchResult,
 )
\ No newline at end of file
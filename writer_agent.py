@@ -1,40 +1,39 @@
+import hashlib
+import io
+import logging
+import os
+from collections.abc import AsyncIterator
+
+import orjson
 from pydantic import BaseModel, Field
-from agents import Agent
-
-INSTRUCTIONS = """You are a senior researcher tasked with writing a cohesive, evidence-based report.
-
-CRITICAL RULES:
-1. Base your report ONLY on the research summaries provided - DO NOT use pre-existing knowledge
-2. The research summaries are based on live web searches (SERPER), so they contain current information
-3. If critical feedback from a research critic is provided, you MUST:
-   - Address the gaps and concerns raised in the feedback
-   - Be explicit about any limitations or assumptions in your findings
-   - Incorporate the critic's insights to strengthen your report
-   - Acknowledge missing information when identified by the critic
-4. Prioritize recent information:
-   - Highlight recent developments, updates, and current status
-   - When dates are mentioned in summaries, include them in your report
-   - If information conflicts, note the discrepancy and mention source dates
-
-5. Report structure:
-   - Create an outline that flows logically
-   - Structure sections to cover all key aspects from the research
-   - Synthesize findings across multiple searches coherently
-   - Include a section addressing critical feedback if provided
-
-6. Verification and transparency:
-   - If research summaries lack information on a topic, explicitly state this gap
-   - Do not fill gaps with assumptions or outdated knowledge
-   - Cross-reference facts that appear in multiple summaries
-   - Be transparent about what is known vs. what is assumed
-
-7. Output requirements:
-   - Format: Markdown
-   - Length: 5-10 pages, at least 1000 words
-   - Style: Detailed, comprehensive, evidence-based
-   - Include ALL three required fields: short_summary, markdown_report, follow_up_questions
-
-The goal is a current, accurate report grounded in real-time web research, not historical knowledge."""
+from agents import Agent, AgentOutputSchema, ModelBehaviorError, ModelSettings, Runner, RunConfig
+from openai.types.responses import ResponseTextDeltaEvent
+
+logger = logging.getLogger(__name__)
+
+# Model for report writing, e.g. a quantized equivalent on a self-hosted endpoint
+WRITER_MODEL = os.getenv("WRITER_MODEL", "gpt-4o-mini")
+# OpenAI-compatible (chat completions) endpoint for the writer only; the other agents stay on the OpenAI API,
+# which the search agent's hosted web search needs. WRITER_API_KEY defaults to OPENAI_API_KEY.
+WRITER_BASE_URL = os.getenv("WRITER_BASE_URL") or None
+# Bounds for the report length asked of the writer, which otherwise scales with the amount of research
+REPORT_MIN_WORDS = 600
+REPORT_MAX_WORDS = 3000
+
+INSTRUCTIONS = """You are a senior researcher writing a cohesive, evidence-based report from research summaries.
+
+Rules:
+1. Use ONLY the research summaries (live web searches, so current) - no pre-existing knowledge.
+2. Critic feedback, if given: address its gaps and concerns, state limitations and assumptions, acknowledge missing information it identifies.
+3. Recency: highlight recent developments and current status, keep dates from the summaries, note conflicts with their source dates.
+4. Structure: logical outline covering every key aspect, findings synthesized across searches, a section on the critic feedback if given.
+5. Transparency: state gaps explicitly, never fill them with assumptions or outdated knowledge, cross-reference facts found in several summaries, separate what is known from what is assumed.
+
+Output: short_summary (2-3 sentences), markdown_report (Markdown, detailed, within the word range given in the input; do not pad beyond the evidence)."""
+
+# Never format per-call values into INSTRUCTIONS: the query, search results and critic feedback go in the
+# input, so every writer call starts with the same system prompt and OpenAI can serve it from its prompt cache
+INSTRUCTIONS_SHA = hashlib.sha256(INSTRUCTIONS.encode()).hexdigest()
 
 
 class ReportData(BaseModel):
@@ -42,12 +41,188 @@ class ReportData(BaseModel):
 
     markdown_report: str = Field(description="The final report")
 
-    follow_up_questions: list[str] = Field(description="Suggested topics to research further")
+    # Suggested by the follow-up agent alongside the writer rather than by the writer itself
+    follow_up_questions: list[str] = Field(default_factory=list, description="Suggested topics to research further")
+
+
+class _WrittenReport(BaseModel):
+    """The part of ReportData the writer produces."""
+
+    short_summary: str = Field(description="A short 2-3 sentence summary of the findings.")
+
+    markdown_report: str = Field(description="The final report")
+
+
+def encode_report(report: ReportData) -> bytes:
+    """Serialize a report to JSON with orjson, e.g. for the report cache."""
+    return orjson.dumps({
+        "short_summary": report.short_summary,
+        "markdown_report": report.markdown_report,
+        "follow_up_questions": report.follow_up_questions,
+    })
+
+
+def decode_report(data: str | bytes) -> ReportData:
+    """Inverse of encode_report; the data is our own output, so it is not validated again."""
+    return ReportData.model_construct(**orjson.loads(data))
+
+
+def word_budget(research_text: str) -> tuple[int, int]:
+    """Word range for a report on the given research summaries, so thin evidence is not padded out."""
+    # Roughly four characters per token
+    input_tokens = len(research_text) // 4
+    min_words = max(REPORT_MIN_WORDS, min(REPORT_MAX_WORDS, 300 + input_tokens * 3 // 10))
+    return min_words, min(REPORT_MAX_WORDS, min_words * 2)
+
+
+class _ReportDataOutput(AgentOutputSchema):
+    """ReportData output schema that decodes with orjson and skips pydantic validation.
+
+    Strict structured outputs already guarantee the shape of the writer's JSON, so the fields are
+    only type-checked before the model is built with model_construct. The report is several KB of
+    markdown, which would otherwise go through a second full validation pass on every run.
+    follow_up_questions is left empty for the follow-up agent to fill in.
+    """
+
+    def __init__(self):
+        super().__init__(_WrittenReport)
+
+    def validate_json(self, json_str: str) -> ReportData:
+        try:
+            data = orjson.loads(json_str)
+        except orjson.JSONDecodeError as e:
+            raise ModelBehaviorError(f"Writer returned invalid JSON: {str(e)}") from e
+        if not (
+            isinstance(data, dict)
+            and isinstance(data.get("short_summary"), str)
+            and isinstance(data.get("markdown_report"), str)
+        ):
+            raise ModelBehaviorError("Writer output does not match ReportData")
+        return ReportData.model_construct(
+            short_summary=data["short_summary"],
+            markdown_report=data["markdown_report"],
+            follow_up_questions=[],
+        )
 
 
 writer_agent = Agent(
     name="WriterAgent",
     instructions=INSTRUCTIONS,
-    model="gpt-4o-mini",
-    output_type=ReportData,
-)
\ No newline at end of file
+    model=WRITER_MODEL,
+    output_type=_ReportDataOutput(),
+    # One key for every writer call (not one per run), so they are routed to the same prompt cache.
+    # prompt_cache_key is an OpenAI parameter, so it is not sent to a self-hosted endpoint.
+    model_settings=ModelSettings(
+        extra_args=None if WRITER_BASE_URL else {"prompt_cache_key": f"writer-{INSTRUCTIONS_SHA[:16]}"},
+    ),
+)
+
+
+class _JsonFieldStream:
+    """Incrementally decodes one top-level string field of a JSON object that arrives in pieces."""
+
+    def __init__(self, field: str):
+        self._marker = f'"{field}"'
+        self._buffer = ""
+        self._state = "key"  # key -> value_start -> value -> done
+
+    def feed(self, text: str) -> str:
+        """Consume the next piece of raw JSON and return any newly decoded text of the field."""
+        if self._state == "done":
+            return ""
+        self._buffer += text
+
+        if self._state == "key":
+            index = self._buffer.find(self._marker)
+            # The field name inside another string value would appear with escaped quotes
+            while index > 0 and self._buffer[index - 1] == "\\":
+                index = self._buffer.find(self._marker, index + 1)
+            if index < 0:
+                self._buffer = self._buffer[-len(self._marker):]
+                return ""
+            self._buffer = self._buffer[index + len(self._marker):]
+            self._state = "value_start"
+
+        if self._state == "value_start":
+            stripped = self._buffer.lstrip(" \t\r\n:")
+            if not stripped:
+                self._buffer = ""
+                return ""
+            if stripped[0] != '"':
+                # Not a string value - nothing to stream
+                self._state = "done"
+                return ""
+            self._buffer = stripped[1:]
+            self._state = "value"
+
+        # Find the longest prefix that ends neither inside an escape sequence nor past the closing quote
+        buffer = self._buffer
+        i, n = 0, len(buffer)
+        while i < n:
+            char = buffer[i]
+            if char == '"':
+                self._state = "done"
+                break
+            if char == "\\":
+                if i + 1 >= n:
+                    break
+                if buffer[i + 1] != "u":
+                    i += 2
+                    continue
+                if i + 6 > n:
+                    break
+                # A high surrogate is only decodable together with the low surrogate that follows it
+                if buffer[i + 2:i + 4].lower() in ("d8", "d9", "da", "db"):
+                    if i + 12 > n:
+                        break
+                    i += 12
+                    continue
+                i += 6
+                continue
+            i += 1
+
+        self._buffer = buffer[i:]
+        try:
+            return orjson.loads(f'"{buffer[:i]}"')
+        except ValueError as e:
+            logger.debug(f"Could not decode streamed JSON field, stopping stream: {str(e)}")
+            self._state = "done"
+            return ""
+
+
+class SummaryChunk(str):
+    """A piece of the short summary yielded by run_streaming; every other str it yields is report text."""
+
+
+async def run_streaming(input_text: str, run_config: RunConfig | None = None) -> AsyncIterator[str | ReportData]:
+    """Run the writer agent, yielding the text as it is generated, then the complete ReportData.
+
+    The writer returns its output as JSON with short_summary first, so the summary is streamed
+    (as SummaryChunk) before the markdown report. The final output is validated once at the end
+    and any report text the stream could not decode is emitted then.
+    """
+    result = Runner.run_streamed(writer_agent, input_text, run_config=run_config)
+    summary = _JsonFieldStream("short_summary")
+    markdown = _JsonFieldStream("markdown_report")
+    streamed = io.StringIO()
+    async for event in result.stream_events():
+        if event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
+            text = summary.feed(event.data.delta)
+            if text:
+                yield SummaryChunk(text)
+            text = markdown.feed(event.data.delta)
+            if text:
+                streamed.write(text)
+                yield text
+    report = result.final_output_as(ReportData)
+
+    # Emit whatever the stream could not decode so the caller ends up with the full report
+    streamed_text = streamed.getvalue()
+    if report.markdown_report.startswith(streamed_text):
+        remainder = report.markdown_report[len(streamed_text):]
+        if remainder:
+            yield remainder
+    else:
+        logger.warning("Streamed report text does not match the final report")
+    yield report
+